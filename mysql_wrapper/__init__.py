@@ -1 +1,2 @@
-from .mysql_wrapper import MySQLWrapper
+from .mysql_wrapper import CircuitOpenError, MySQLWrapper
+from .insert_buffer import InsertBuffer
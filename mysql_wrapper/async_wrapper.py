@@ -0,0 +1,209 @@
+import aiomysql
+from aiomysql import Error
+import logging
+
+from .mysql_wrapper import _StatementCache, _row_getter
+
+logger = logging.getLogger(__name__)
+
+class AsyncMySQLWrapper:
+    """
+    An asyncio counterpart of MySQLWrapper built on aiomysql.
+
+    Every operation borrows a connection from an aiomysql pool, so independent queries
+    can run concurrently and overlap their network waits:
+
+        async with AsyncMySQLWrapper(host, user, password, database) as db:
+            results = await asyncio.gather(*[db.get(t, where_clause=w) for t in tables])
+    """
+
+    def __init__(self, host, user, password, database, minsize=2, maxsize=16):
+        """
+        Initializes the AsyncMySQLWrapper instance with database connection details.
+        The pool is created by connect() or on entering the async context manager.
+
+        :param host: The MySQL server host.
+        :param user: The MySQL user.
+        :param password: The MySQL user's password.
+        :param database: The name of the MySQL database.
+        :param minsize: Minimum number of connections kept open in the pool.
+        :param maxsize: Maximum number of connections the pool may open.
+        """
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self._pool = None
+        self._statements = _StatementCache()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connect(self):
+        """
+        Establishes a pool of connections to the MySQL database.
+        """
+        try:
+            if self._pool is not None:
+                logger.info("Using existing MySQL connection pool")
+            else:
+                self._pool = await aiomysql.create_pool(
+                    host=self.host,
+                    user=self.user,
+                    password=self.password,
+                    db=self.database,
+                    minsize=self.minsize,
+                    maxsize=self.maxsize,
+                    # Every operation is a single statement; without autocommit a read leaves its connection
+                    # in a transaction, which Pool.release closes instead of reusing
+                    autocommit=True
+                )
+                logger.info("Connected to MySQL database with a pool of up to %d connection(s)", self.maxsize)
+        except Error as e:
+            logger.error("Error while connecting to MySQL: %s", e)
+            raise e
+
+    async def _execute(self, query, params=None, many=False):
+        """
+        Executes a query on a pooled connection. The pool runs in autocommit mode, so writes are committed by the server.
+
+        :param query: SQL query to execute.
+        :param params: Parameters to pass to the SQL query, or a sequence of them when many is True.
+        :param many: Whether to run the query once per parameter set with executemany.
+        :return: A (rows, rowcount, lastrowid) tuple, where rows is None for statements without a result set.
+        """
+        async with self._pool.acquire() as conn, conn.cursor() as cur:
+            try:
+                if many:
+                    await cur.executemany(query, params)
+                else:
+                    await cur.execute(query, params)
+                # The server reports whether a result set came back, which a keyword check of the query
+                # gets wrong for statements such as WITH ... UPDATE
+                rows = await cur.fetchall() if cur.description is not None else None
+                return rows, cur.rowcount, cur.lastrowid
+            except Error as e:
+                logger.error("Error while executing query: %s", e)
+                raise e
+
+    async def insert_one(self, table, data):
+        """
+        Inserts a single record into the specified table.
+
+        :param table: The name of the table to insert the record into.
+        :param data: A dictionary representing the record to insert.
+        """
+        try:
+            query = self._statements.insert(table, tuple(data))
+            _, rowcount, lastrowid = await self._execute(query, tuple(data.values()))
+            logger.info("Inserted %d row(s) into %s", rowcount, table)
+            return lastrowid
+        except Error as e:
+            logger.error("Error while inserting data: %s", e)
+            raise e
+
+    async def insert_many(self, table, data_list):
+        """
+        Inserts multiple records into the specified table.
+
+        :param table: The name of the table to insert the records into.
+        :param data_list: A list of dictionaries, each representing a record to insert.
+        :raises ValueError: If the data_list is empty.
+        """
+        if not data_list:
+            raise ValueError("The data_list is empty.")
+
+        try:
+            cols = tuple(data_list[0])
+            query = self._statements.insert(table, cols)
+            values = list(map(_row_getter(cols), data_list))
+            _, rowcount, lastrowid = await self._execute(query, values, many=True)
+            logger.info("Inserted %d rows into %s", rowcount, table)
+            return lastrowid
+        except Error as e:
+            logger.error("Error while inserting bulk data: %s", e)
+            raise e
+
+    async def update(self, table, data, where_clause):
+        """
+        Updates records in the specified table based on the provided where_clause.
+
+        :param table: The name of the table to update.
+        :param data: A dictionary representing the columns and their new values.
+        :param where_clause: The WHERE clause to filter which records to update.
+        """
+        try:
+            query = self._statements.update(table, tuple(data), where_clause)
+            _, rowcount, _ = await self._execute(query, tuple(data.values()))
+            logger.info("Updated %d row(s) in %s", rowcount, table)
+            return rowcount
+        except Error as e:
+            logger.error("Error while updating data: %s", e)
+            raise e
+
+    async def delete(self, table, where_clause):
+        """
+        Deletes records from the specified table based on the provided where_clause.
+
+        :param table: The name of the table to delete records from.
+        :param where_clause: The WHERE clause to filter which records to delete.
+        """
+        try:
+            query = self._statements.delete(table, where_clause)
+            _, rowcount, _ = await self._execute(query)
+            logger.info("Deleted %d row(s) from %s", rowcount, table)
+            return rowcount
+        except Error as e:
+            logger.error("Error while deleting data: %s", e)
+            raise e
+
+    async def get(self, table, columns="*", where_clause=None):
+        """
+        Retrieves data from the specified table based on the provided where_clause.
+
+        :param table: The name of the table to retrieve data from.
+        :param columns: A list of columns to retrieve, or "*" for all columns. Plain names are quoted, while
+            expressions such as "COUNT(*)" or "name AS n" are passed through unchanged.
+        :param where_clause: Optional WHERE clause to filter results.
+        :return: A list of tuples representing the retrieved rows.
+        """
+        try:
+            if isinstance(columns, list):
+                columns = tuple(columns)
+            query = self._statements.select(table, columns, where_clause)
+            rows, _, _ = await self._execute(query)
+            return rows
+        except Error as e:
+            logger.error("Error while retrieving data: %s", e)
+            return None
+
+    async def execute_query(self, query, params=None):
+        """
+        Executes a raw SQL query, including SELECT, INSERT, UPDATE, and DELETE.
+
+        :param query: The raw SQL query to execute.
+        :param params: Optional parameters for the query (used with parameterized queries).
+        :return: The rows for statements returning a result set, or the affected row count for other queries.
+        """
+        try:
+            rows, rowcount, _ = await self._execute(query, params)
+            return rowcount if rows is None else rows
+        except Error as e:
+            logger.error("Error while executing query: %s", e)
+            return None
+
+    async def close(self):
+        """
+        Closes all pooled connections to the MySQL database.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+            logger.info("MySQL connection pool closed")
@@ -0,0 +1,136 @@
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class InsertBuffer:
+    """
+    Coalesces single-row inserts into batched MySQLWrapper.insert_many calls.
+
+    Rows passed to put() are collected by a background thread and flushed when max_batch rows
+    are pending or max_delay_ms has passed since the first of them, whichever comes first.
+    Rows are grouped by table and column set, so each group becomes one multi-row INSERT.
+
+        with InsertBuffer(db) as buffer:
+            futures = [buffer.put("events", event) for event in events]
+        for future in futures:
+            future.result()
+    """
+
+    def __init__(self, wrapper, max_batch=500, max_delay_ms=10):
+        """
+        Initializes the InsertBuffer and starts its flushing thread.
+
+        :param wrapper: The MySQLWrapper used to insert the rows.
+        :param max_batch: Maximum number of rows collected before a flush.
+        :param max_delay_ms: Maximum time in milliseconds a row waits before it is flushed.
+        """
+        self.wrapper = wrapper
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue()
+        self._closed = False
+        # Makes checking _closed and enqueueing atomic, so no row is queued behind the stop sentinel
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="InsertBuffer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def put(self, table, data):
+        """
+        Queues a record for insertion into the specified table.
+
+        :param table: The name of the table to insert the record into.
+        :param data: A dictionary representing the record to insert.
+        :return: A concurrent.futures.Future that resolves to None once the record's batch is committed,
+            or raises the batch's error. Wrap it with asyncio.wrap_future() to await it.
+        :raises TypeError: If data is not a dictionary.
+        :raises ValueError: If data is empty.
+        :raises RuntimeError: If the buffer has been closed.
+        """
+        # Checked here, since a bad record would otherwise only fail on the flushing thread
+        if not isinstance(data, dict):
+            raise TypeError("data must be a dictionary.")
+        if not data:
+            raise ValueError("data is empty.")
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The InsertBuffer is closed.")
+            self._queue.put((table, data, future))
+        return future
+
+    def close(self):
+        """
+        Flushes the pending rows and stops the background thread.
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        """
+        Collects queued rows into batches and flushes them until the buffer is closed.
+        """
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            items = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(items) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                items.append(item)
+            try:
+                self._flush(items)
+            except Exception as e:
+                # Fail the batch rather than the thread, which would strand every later row
+                logger.exception("Error while flushing buffered rows")
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, items):
+        """
+        Inserts a batch of queued rows, one insert_many call per table and column set.
+
+        :param items: A list of (table, data, future) tuples.
+        """
+        groups = {}
+        for table, data, future in items:
+            # Skip rows whose caller cancelled the future before the flush
+            if future.set_running_or_notify_cancel():
+                groups.setdefault((table, frozenset(data)), []).append((data, future))
+
+        for (table, _), group in groups.items():
+            try:
+                self.wrapper.insert_many(table, [data for data, _ in group])
+            except Exception as e:
+                logger.error("Error while flushing buffered rows into %s: %s", table, e)
+                for _, future in group:
+                    future.set_exception(e)
+            else:
+                for _, future in group:
+                    future.set_result(None)
@@ -1,19 +1,292 @@
 import mysql.connector
-from mysql.connector import Error
-import time
+from mysql.connector import DataError, Error, InterfaceError, OperationalError, ProgrammingError
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import CONNECTION_POOL_LOCK, MySQLConnectionPool, PooledMySQLConnection
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from itertools import chain, islice
+from operator import itemgetter
+import cachetools
+import hashlib
 import logging
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import weakref
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+class CircuitOpenError(Error):
+    """
+    Raised instead of connecting while the circuit breaker is open after recent connection failures.
+    """
+
+
+class _IdleAwarePool(MySQLConnectionPool):
+    """
+    A MySQLConnectionPool that only pings a connection on checkout once it has been idle for idle_timeout seconds.
+    The stock pool pings on every checkout, which costs a round-trip per query; a recently used connection
+    that has dropped anyway is caught and reconnected by MySQLWrapper._execute_query instead.
+    Dropped connections are reconnected through the reconnect callable, which defaults to cnx.reconnect().
+    """
+
+    def __init__(self, idle_timeout=300, reconnect=None, **kwargs):
+        self.idle_timeout = idle_timeout
+        self._reconnect = reconnect or (lambda cnx: cnx.reconnect())
+        super().__init__(**kwargs)
+
+    def _queue_connection(self, cnx):
+        cnx.last_active_time = time.monotonic()
+        super()._queue_connection(cnx)
+
+    def get_connection(self):
+        with CONNECTION_POOL_LOCK:
+            try:
+                cnx = self._cnx_queue.get(block=False)
+            except queue.Empty as err:
+                raise PoolError("Failed getting connection; pool exhausted") from err
+
+            idle_time = time.monotonic() - cnx.last_active_time
+            if (
+                self._config_version != cnx.pool_config_version
+                or (idle_time >= self.idle_timeout and not cnx.is_connected())
+            ):
+                cnx.config(**self._cnx_config)
+                try:
+                    self._reconnect(cnx)
+                except Error:
+                    self._queue_connection(cnx)
+                    raise
+                cnx.pool_config_version = self._config_version
+
+            return PooledMySQLConnection(self, cnx)
+
+
+# Statements whose results execute_query may cache; match() stops at the first keyword without scanning the query
+_READ_QUERY_RE = re.compile(r'\s*(?:SELECT|WITH|SHOW|EXPLAIN|DESCRIBE|DESC)\b', re.IGNORECASE)
+
+
+def _q(ident):
+    """
+    Quotes a table or column name with backticks, quoting each part of a dotted name such as db.table.
+    """
+    return '.'.join('`' + part.replace('`', '``') + '`' for part in ident.split('.'))
+
+
+# Plain column names, optionally table-qualified, which select() quotes; anything else is an expression
+_COLUMN_NAME_RE = re.compile(r'\w+(?:\.\w+)?')
+
+
+# Statements that change nothing on the server, so repeating them after a dropped connection is harmless.
+# WITH is left out because it can also lead an UPDATE or DELETE.
+_IDEMPOTENT_QUERY_RE = re.compile(r'\s*(?:SELECT|SHOW|EXPLAIN|DESCRIBE|DESC)\b', re.IGNORECASE)
+
+
+class _StatementCache:
+    """
+    Memoizes the SQL built for each statement shape, keeping at most maxsize entries and evicting the oldest.
+    Repeat calls skip identifier quoting and the string joins, and hand the same string object to the
+    prepared cursor, which only re-prepares when it is given a different statement.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._skel = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._skel.clear()
+
+    def _remember(self, key, query):
+        with self._lock:
+            self._skel[key] = query
+            if len(self._skel) > self.maxsize:
+                self._skel.popitem(last=False)
+        return query
+
+    def insert(self, table, cols):
+        """
+        Returns the INSERT statement for one record with the given column order.
+        """
+        key = ('insert', table, cols)
+        query = self._skel.get(key)
+        if query is None:
+            placeholders = ', '.join(['%s'] * len(cols))
+            query = self._remember(key, f"INSERT INTO {_q(table)} ({', '.join(map(_q, cols))}) VALUES ({placeholders})")
+        return query
+
+    def insert_many(self, table, cols, row_count):
+        """
+        Returns the multi-row INSERT statement with one placeholder group per row.
+        """
+        key = ('insert_many', table, cols, row_count)
+        query = self._skel.get(key)
+        if query is None:
+            row = '(' + ', '.join(['%s'] * len(cols)) + ')'
+            query = self._remember(
+                key, f"INSERT INTO {_q(table)} ({', '.join(map(_q, cols))}) VALUES " + ', '.join([row] * row_count)
+            )
+        return query
+
+    def load_data(self, table, cols):
+        """
+        Returns the LOAD DATA LOCAL INFILE statement reading a file written by _csv_field, whose path is its parameter.
+        """
+        key = ('load_data', table, cols)
+        query = self._skel.get(key)
+        if query is None:
+            query = self._remember(
+                key,
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {_q(table)} CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' LINES TERMINATED BY '\\n' "
+                f"({', '.join(map(_q, cols))})"
+            )
+        return query
+
+    def update(self, table, cols, where_clause):
+        """
+        Returns the UPDATE statement setting the given columns, in order.
+        """
+        key = ('update', table, cols, where_clause)
+        query = self._skel.get(key)
+        if query is None:
+            set_clause = ', '.join([f"{_q(col)} = %s" for col in cols])
+            query = self._remember(key, f"UPDATE {_q(table)} SET {set_clause} WHERE {where_clause}")
+        return query
+
+    def delete(self, table, where_clause):
+        """
+        Returns the DELETE statement for the given WHERE clause.
+        """
+        key = ('delete', table, where_clause)
+        query = self._skel.get(key)
+        if query is None:
+            query = self._remember(key, f"DELETE FROM {_q(table)} WHERE {where_clause}")
+        return query
+
+    def select(self, table, columns, where_clause):
+        """
+        Returns the SELECT statement for the given columns, either raw text such as "*" or a tuple of names.
+        Names are quoted; expressions such as "COUNT(*)" or "name AS n" are passed through as written.
+        """
+        key = ('select', table, columns, where_clause)
+        query = self._skel.get(key)
+        if query is None:
+            if isinstance(columns, tuple):
+                columns = ', '.join(_q(col) if _COLUMN_NAME_RE.fullmatch(col) else col for col in columns)
+            query = f"SELECT {columns} FROM {_q(table)}"
+            if where_clause:
+                query += f" WHERE {where_clause}"
+            query = self._remember(key, query)
+        return query
+
+
+def _csv_field(value):
+    """
+    Formats a value as a field of a LOAD DATA file: NULL and numbers bare, anything else enclosed in
+    double quotes with embedded quotes doubled.
+
+    :raises ValueError: For binary values, which cannot be written to the text file.
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        raise ValueError("Binary values cannot be bulk loaded from a text file.")
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _cache_key(*parts):
+    """
+    Hashes the parts of a read query into a compact key for the query-result cache.
+    """
+    return hashlib.blake2b('|'.join(map(repr, parts)).encode(), digest_size=16).digest()
+
+
+class _ConnectionCursors:
+    """
+    The cursors kept open on one pooled connection: a plain cursor shared by all plain queries,
+    and one prepared cursor per statement so the server-side handle is reused across calls.
+    """
+
+    max_prepared = 64
+
+    def __init__(self, cnx):
+        self.connection_id = cnx.connection_id
+        self.plain = cnx.cursor()
+        self.prepared = OrderedDict()
+
+    def get_prepared(self, cnx, query):
+        """
+        Returns the prepared cursor of the statement, evicting the least recently used one when full.
+        """
+        cursor = self.prepared.get(query)
+        if cursor is None:
+            cursor = self.prepared[query] = cnx.cursor(prepared=True)
+            if len(self.prepared) > self.max_prepared:
+                self.prepared.popitem(last=False)[1].close()
+        else:
+            self.prepared.move_to_end(query)
+        return cursor
+
+    def discard(self, query):
+        """
+        Closes and forgets the prepared cursor of the statement, if there is one.
+        """
+        cursor = self.prepared.pop(query, None)
+        if cursor is not None:
+            cursor.close()
+
+
+# Every prepared execute is preceded by a blocking COM_STMT_RESET, so a prepared insert_one costs two round-trips
+# to the text protocol's one. Only the C extension, which encodes the binary protocol natively instead of escaping
+# each value into the SQL text in Python, uses them; the pure-Python connector sends inserts as plain text.
+_PREPARE_INSERTS = mysql.connector.HAVE_CEXT
+
+
+def _row_getter(cols):
+    """
+    Returns a callable extracting the values of cols from a record dict as a tuple.
+    For more than one column this is operator.itemgetter, which runs in C.
+    """
+    if len(cols) == 1:
+        col = cols[0]
+        return lambda row: (row[col],)
+    return itemgetter(*cols)
+
+
+def _chunked(iterable, n):
+    """
+    Yields successive lists of at most n items from the iterable.
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, n))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, n))
+
+
 class MySQLWrapper:
     """
     A wrapper class to handle MySQL database operations such as connect, insert, update, delete, and retrieve data.
     """
 
-    def __init__(self, host, user, password, database, idle_timeout=300):
+    def __init__(self, host, user, password, database, idle_timeout=300, *, pool_size=5, query_cache_ttl=0,
+                 compress=False, autocommit=False, bulk_threshold=None, pool_timeout=30):
         """
         Initializes the MySQLWrapper instance with database connection details.
         
@@ -21,84 +294,364 @@ class MySQLWrapper:
         :param user: The MySQL user.
         :param password: The MySQL user's password.
         :param database: The name of the MySQL database.
-        :param idle_timeout: Time in seconds after which idle connection will be closed.
+        :param idle_timeout: Seconds a pooled connection may sit idle before it is pinged on checkout.
+        :param pool_size: Number of connections kept open in the connection pool.
+        :param query_cache_ttl: Seconds to keep results of get() and SELECT queries in memory; 0 disables the cache.
+        :param compress: Whether to compress the client/server protocol. This costs CPU on both ends,
+            but can halve the wall time of large TEXT/BLOB result sets on slower links.
+        :param autocommit: Whether the server commits every statement itself, which saves the COMMIT
+            round-trip after each write. insert_many then commits each chunk separately.
+        :param bulk_threshold: Number of records from which insert_many loads them with LOAD DATA LOCAL INFILE
+            instead of INSERT statements; None disables it. The server must have local_infile enabled.
+            A load that skips or truncates any row is rolled back and retried with INSERT statements.
+        :param pool_timeout: Seconds to wait for a pooled connection when all of them are in use.
         """
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
-        self.last_active_time = time.time()
+        self.pool_size = pool_size
         self.idle_timeout = idle_timeout
+        self.compress = compress
+        self.autocommit = autocommit
+        self.bulk_threshold = bulk_threshold
+        self.pool_timeout = pool_timeout
+        self._infile_dir = None
+        self._breaker = {'fail_count': 0, 'open_until': 0.0}
+        self._pool = None
+        self._connect_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+        self._executor = None
+        self._statements = _StatementCache()
+        self._cursors = weakref.WeakKeyDictionary()
+        self._cursors_lock = threading.Lock()
+        # Maps connections whose pending result belongs to a get(stream=True) still being iterated to that stream
+        self._streams = weakref.WeakKeyDictionary()
+        self.query_cache_ttl = query_cache_ttl
+        self._qcache = cachetools.TTLCache(maxsize=1024, ttl=query_cache_ttl) if query_cache_ttl else None
+        self._qcache_lock = threading.Lock()
+        # Invalidations per table, with None counting those of every table, and full clears
+        self._qcache_gen = Counter()
+        self._qcache_epoch = 0
         self.connect()
 
     def connect(self):
         """
-        Establishes a connection to the MySQL database.
+        Establishes a pool of connections to the MySQL database. Queries call this themselves
+        when the pool has been closed.
+
+        :raises CircuitOpenError: If a recent connection attempt failed and the backoff period has not elapsed.
         """
+        # Serializes the lazy reconnects of threads that find the pool closed
+        with self._connect_lock:
+            try:
+                if self._pool is not None:
+                    logger.info("Using existing MySQL connection pool")
+                else:
+                    self._check_breaker()
+                    if self.bulk_threshold:
+                        # The connections may only send LOAD DATA files from this private directory
+                        self._infile_dir = tempfile.mkdtemp(prefix="mysql_wrapper-")
+                    self._pool = _IdleAwarePool(
+                        idle_timeout=self.idle_timeout,
+                        reconnect=self._reconnect,
+                        pool_name="mw",
+                        pool_size=self.pool_size,
+                        # Keep sessions across checkouts so cached prepared statements stay valid
+                        pool_reset_session=False,
+                        host=self.host,
+                        user=self.user,
+                        password=self.password,
+                        database=self.database,
+                        compress=self.compress,
+                        autocommit=self.autocommit,
+                        allow_local_infile_in_path=self._infile_dir,
+                        # Use the C extension's protocol implementation whenever it is installed
+                        use_pure=not mysql.connector.HAVE_CEXT
+                    )
+                    self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="mw")
+                    self._reset_breaker()
+                    logger.info("Connected to MySQL database with a pool of %d connection(s)", self.pool_size)
+            except CircuitOpenError:
+                raise
+            except Error as e:
+                logger.error("Error while connecting to MySQL: %s", e)
+                if self._infile_dir is not None:
+                    shutil.rmtree(self._infile_dir, ignore_errors=True)
+                    self._infile_dir = None
+                self._trip_breaker()
+                raise e
+
+    def _check_breaker(self):
+        """
+        Fails fast while the circuit breaker is open, so callers don't storm a struggling server with handshakes.
+
+        :raises CircuitOpenError: If the backoff period of the last failure has not elapsed.
+        """
+        remaining = self._breaker['open_until'] - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpenError(f"MySQL circuit breaker is open; retry in {remaining:.2f}s")
+
+    def _trip_breaker(self):
+        """
+        Records a failed connection attempt and opens the breaker for an exponentially growing period, capped at 30s.
+        """
+        self._breaker['fail_count'] += 1
+        self._breaker['open_until'] = time.monotonic() + min(30, 0.1 * 2 ** self._breaker['fail_count'])
+
+    def _reset_breaker(self):
+        """
+        Closes the breaker after a successful connection.
+        """
+        if self._breaker['fail_count']:
+            self._breaker['fail_count'] = 0
+            self._breaker['open_until'] = 0.0
+
+    def _reconnect(self, cnx):
+        """
+        Reconnects a dropped pooled connection, subject to the circuit breaker.
+
+        :param cnx: The MySQL connection underlying a pooled connection.
+        :raises CircuitOpenError: If the backoff period of the last failure has not elapsed.
+        """
+        self._check_breaker()
         try:
-            if self.connection and self.connection.is_connected():
-                logger.info("Using existing MySQL connection")
-            else:
-                self.connection = mysql.connector.connect(
-                    host=self.host,
-                    user=self.user,
-                    password=self.password,
-                    database=self.database
-                )
-                if self.connection.is_connected():
-                    logger.info("Connected to MySQL database")
-                self.last_active_time = time.time()
-        except Error as e:
-            logger.error(f"Error while connecting to MySQL: {e}")
-            raise e
+            cnx.reconnect()
+        except Error:
+            self._trip_breaker()
+            raise
+        self._reset_breaker()
 
     def is_connected(self):
         """
         Checks if the connection to the MySQL database is established.
         
-        :return: True if the connection is established, False otherwise.
+        :return: True if a pooled connection can reach the server, False otherwise.
         """
-        self._handle_idle_connection()
-        return self.connection is not None and self.connection.is_connected()
+        if self._pool is None:
+            return False
+        try:
+            with self._connection() as conn:
+                connected = conn.is_connected()
+        except Error:
+            return False
+        if connected:
+            self._reset_breaker()
+        return connected
 
-    def _handle_idle_connection(self):
+    @contextmanager
+    def _connection(self):
         """
-        Handles idle connection by checking if it has been idle for too long and closing it if necessary.
+        Borrows a connection from the pool, waiting up to pool_timeout seconds for one to be returned
+        when all of them are in use. Inside transaction() the transaction's connection is used instead.
+
+        :raises PoolError: If no connection was returned in time, e.g. when a thread already holding
+            the last one (such as while streaming get() results) borrows another.
         """
-        if self.connection and self.connection.is_connected():
-            idle_time = time.time() - self.last_active_time
-            if idle_time > self.idle_timeout:
-                logger.info("Connection has been idle for too long. Closing connection.")
-                self.close()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        if self._pool is None:
+            # Reconnect lazily after close()
+            self.connect()
+        if not self._pool_slots.acquire(timeout=self.pool_timeout):
+            raise PoolError(f"Failed getting connection; none returned to the pool within {self.pool_timeout}s")
+        try:
+            with self._pool.get_connection() as conn:
+                try:
+                    yield conn
+                finally:
+                    # Sessions outlive checkouts, so end whatever transaction is still open: the implicit one a
+                    # read starts, which would pin the next user to a stale snapshot, or a failed write's leftovers
+                    if conn.in_transaction:
+                        try:
+                            conn.rollback()
+                        except Error as e:
+                            logger.error("Error while rolling back: %s", e)
+        finally:
+            self._pool_slots.release()
 
-    def _reconnect_if_needed(self):
+    @contextmanager
+    def transaction(self):
         """
-        Reconnects to the database if the connection is not established.
+        Runs the operations in the block as one transaction on a single pooled connection,
+        committing when the block succeeds and rolling back when it raises.
+        Operations run from other threads during the block are not part of the transaction.
+
+            with db.transaction():
+                db.insert_one("orders", order)
+                db.update("stock", {"quantity": quantity}, "id = 1")
         """
-        if not self.is_connected():
-            logger.info("Reconnecting to the database...")
-            self.connect()
+        if self._in_transaction():
+            # Nested blocks join the outer transaction
+            yield self
+            return
+        with self._connection() as conn:
+            conn.start_transaction()
+            self._local.conn = conn
+            try:
+                yield self
+                # A stream still open at the end of the block would make the commit fail on its unread rows
+                self._end_stream(conn)
+                conn.commit()
+            except BaseException:
+                self._end_stream(conn)
+                conn.rollback()
+                raise
+            finally:
+                self._local.conn = None
+                # Reads made during the block may have cached rows that were rolled back or went stale
+                self.invalidate()
 
-    def _execute_query(self, query, params=None):
+    def _in_transaction(self):
         """
-        Executes a query and manages connection retries.
+        Tells whether the calling thread is inside a transaction() block.
+        """
+        return getattr(self._local, "conn", None) is not None
+
+    def _commit(self, conn):
+        """
+        Commits the work done on the connection, unless the server already does so in autocommit mode
+        or it belongs to a transaction() block, which commits once at the end.
+
+        :param conn: A connection acquired from the pool.
+        """
+        if not self.autocommit and not self._in_transaction():
+            conn.commit()
+
+    def clear_statement_cache(self):
+        """
+        Clears the cached SQL statements. Call this after DDL changes a table's columns.
+        """
+        self._statements.clear()
+
+    def _cache_get(self, key):
+        """
+        Looks up a cached result. Reads inside transaction() always go to the server, so they see the
+        transaction's own writes and take the locks of SELECT ... FOR UPDATE.
+
+        :param key: The cache key of the query.
+        :return: A copy of the cached rows, or None if they are not cached.
+        """
+        if self._qcache is None or self._in_transaction():
+            return None
+        with self._qcache_lock:
+            entry = self._qcache.get(key)
+        return None if entry is None else list(entry[1])
+
+    def _cache_generation(self, table):
+        """
+        Returns a token that changes whenever cached results of the table are invalidated.
+        Read it before running the query whose rows will be passed to _cache_put.
+
+        :param table: The table the query reads, or None if unknown.
+        """
+        with self._qcache_lock:
+            return self._qcache_epoch, self._qcache_gen[table]
 
+    def _cache_put(self, key, table, rows, generation):
+        """
+        Stores the rows of a read query in the cache, unless the table was written to since generation was taken:
+        the rows may then predate a concurrent write whose invalidate() ran before they could be stored.
+
+        :param key: The cache key of the query.
+        :param table: The table the rows were read from, or None if unknown.
+        :param rows: The rows returned by the query.
+        :param generation: The table's _cache_generation from before the query ran.
+        """
+        # Rows read inside transaction() may include uncommitted writes
+        if self._qcache is not None and not self._in_transaction():
+            with self._qcache_lock:
+                if generation == (self._qcache_epoch, self._qcache_gen[table]):
+                    self._qcache[key] = (table, list(rows))
+
+    def invalidate(self, table=None):
+        """
+        Evicts cached results of the given table, along with raw SELECT results whose tables are unknown.
+        Called automatically by the write methods of this wrapper.
+
+        :param table: The table whose results to evict, or None to clear the whole cache.
+        """
+        if self._qcache is None:
+            return
+        with self._qcache_lock:
+            if table is None:
+                self._qcache_epoch += 1
+                self._qcache.clear()
+            else:
+                self._qcache_gen[table] += 1
+                self._qcache_gen[None] += 1
+                for key, (cached_table, _) in list(self._qcache.items()):
+                    if cached_table is None or cached_table == table:
+                        self._qcache.pop(key, None)
+
+    def _execute_query(self, conn, query, params=None, prepared=False):
+        """
+        Executes a query on the given pooled connection.
+
+        :param conn: A connection acquired from the pool.
         :param query: SQL query to execute.
         :param params: Parameters to pass to the SQL query.
-        :return: Cursor object after executing the query.
+        :param prepared: Whether to execute the query as a server-side prepared statement.
+        :return: Cursor object after executing the query. It is reused by later queries on the same connection.
         """
-        self._reconnect_if_needed()
+        cnx = conn._cnx
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            self.last_active_time = time.time()
+            try:
+                cursor = self._cursor(cnx, query, prepared)
+                cursor.execute(query, params)
+            except (OperationalError, InterfaceError) as e:
+                # Reconnecting mid-transaction would silently drop the statements already sent
+                if cnx.in_transaction:
+                    raise
+                logger.info("Reconnecting to the database after: %s", e)
+                self._reconnect(cnx)
+                # In autocommit mode the server may have committed a write before the connection dropped, so the
+                # write fails rather than risk running twice; otherwise the server rolled the lost write back
+                if self.autocommit and not _IDEMPOTENT_QUERY_RE.match(query):
+                    raise
+                cursor = self._cursor(cnx, query, prepared)
+                cursor.execute(query, params)
             return cursor
         except Error as e:
-            logger.error(f"Error while executing query: {e}")
-            self.connection.rollback()
+            logger.error("Error while executing query: %s", e)
+            # The plain cursor survives a failed statement; a prepared one may be left half-executed, so only
+            # that statement's handle is closed, and the rest stay prepared on the server for reuse
+            if prepared:
+                with self._cursors_lock:
+                    cursors = self._cursors.get(cnx)
+                if cursors is not None and cursors.connection_id == cnx.connection_id:
+                    try:
+                        cursors.discard(query)
+                    except Error as close_error:
+                        logger.error("Error while closing prepared statement: %s", close_error)
             raise e
 
+    def _cursor(self, cnx, query, prepared):
+        """
+        Returns a cursor cached on the connection, ready to execute the query.
+
+        :param cnx: The MySQL connection underlying a pooled connection.
+        :param query: SQL query the cursor will execute.
+        :param prepared: Whether a prepared cursor is needed.
+        :return: A cursor bound to the connection.
+        :raises ProgrammingError: If a stream is still reading its rows from the connection, as happens when
+            a transaction() block runs another query while iterating get(stream=True).
+        """
+        with self._cursors_lock:
+            if cnx in self._streams:
+                raise ProgrammingError("Unread result found; finish or close the streamed get() first")
+            cursors = self._cursors.get(cnx)
+            # A new connection_id means the pool reconnected and the old cursors belong to a dead session
+            if cursors is None or cursors.connection_id != cnx.connection_id:
+                cursors = self._cursors[cnx] = _ConnectionCursors(cnx)
+        # Anything else pending was left behind by the wrapper itself and is safe to drop
+        if cnx.unread_result:
+            cnx.consume_results()
+        return cursors.get_prepared(cnx, query) if prepared else cursors.plain
+
     def insert_one(self, table, data):
         """
         Inserts a single record into the specified table.
@@ -107,42 +660,131 @@ class MySQLWrapper:
         :param data: A dictionary representing the record to insert.
         """
         try:
-            columns = ', '.join(data.keys())
-            placeholders = ', '.join(['%s'] * len(data))
-            query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-            cursor = self._execute_query(query, tuple(data.values()))
-            self.connection.commit()
-            logger.info(f"Inserted {cursor.rowcount} row(s) into {table}")
-            return cursor.lastrowid
+            query = self._statements.insert(table, tuple(data))
+            with self._connection() as conn:
+                cursor = self._execute_query(conn, query, tuple(data.values()), prepared=_PREPARE_INSERTS)
+                self._commit(conn)
+                self.invalidate(table)
+                logger.info("Inserted %d row(s) into %s", cursor.rowcount, table)
+                return cursor.lastrowid
         except Error as e:
-            logger.error(f"Error while inserting data: {e}")
+            logger.error("Error while inserting data: %s", e)
             raise e
 
-    def insert_many(self, table, data_list):
+    def insert_many(self, table, data_list, chunk_size=500, columns=None):
         """
         Inserts multiple records into the specified table.
+
+        Records are sent as multi-row INSERT statements of up to chunk_size rows each,
+        so a bulk load costs one round-trip per chunk rather than one per row.
         
         :param table: The name of the table to insert the records into.
-        :param data_list: A list of dictionaries, each representing a record to insert.
-        :raises ValueError: If the data_list is empty.
+        :param data_list: A list of dictionaries, each representing a record to insert,
+            or a list of tuples/lists ordered like columns.
+        :param chunk_size: Maximum number of rows sent in a single INSERT statement.
+        :param columns: The column names, required when records are sequences rather than dictionaries.
+        :raises ValueError: If the data_list is empty, or columns is missing for sequence records.
         """
         if not data_list:
             raise ValueError("The data_list is empty.")
         
         try:
-            columns = ', '.join(data_list[0].keys())
-            placeholders = ', '.join(['%s'] * len(data_list[0]))
-            query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-            values = [tuple(data.values()) for data in data_list]
-
-            cursor = self._execute_query(query, values)
-            self.connection.commit()
-            logger.info(f"Inserted {cursor.rowcount} rows into {table}")
-            return cursor.lastrowid
+            if isinstance(data_list[0], dict):
+                cols = tuple(data_list[0].keys())
+                getter = _row_getter(cols)
+            elif columns:
+                cols = tuple(columns)
+                getter = None
+            else:
+                raise ValueError("columns is required when records are not dictionaries.")
+
+            if self.bulk_threshold and len(data_list) >= self.bulk_threshold:
+                try:
+                    return self._load_data(table, cols, getter, data_list)
+                except (Error, ValueError) as e:
+                    logger.warning("Bulk load into %s failed, falling back to INSERT statements: %s", table, e)
+
+            inserted = 0
+
+            with self._connection() as conn:
+                for chunk in _chunked(data_list, chunk_size):
+                    query = self._statements.insert_many(table, cols, len(chunk))
+                    rows = chunk if getter is None else map(getter, chunk)
+                    params = list(chain.from_iterable(rows))
+                    cursor = self._execute_query(conn, query, params)
+                    inserted += cursor.rowcount
+                self._commit(conn)
+                self.invalidate(table)
+                logger.info("Inserted %d rows into %s", inserted, table)
+                return cursor.lastrowid
         except Error as e:
-            logger.error(f"Error while inserting bulk data: {e}")
+            logger.error("Error while inserting bulk data: %s", e)
             raise e
 
+    def _load_data(self, table, cols, getter, data_list):
+        """
+        Bulk loads records with LOAD DATA LOCAL INFILE from a temporary CSV file, which the server
+        ingests as a stream instead of parsing one INSERT per chunk.
+
+        :param table: The name of the table to load the records into.
+        :param cols: A tuple of column names.
+        :param getter: A callable extracting a record's values in column order, or None for sequence records.
+        :param data_list: The records to load.
+        :return: The last row ID reported by the server.
+        :raises DataError: If the server skipped or truncated any row, after undoing the load.
+        """
+        rows = data_list if getter is None else map(getter, data_list)
+        fd, path = tempfile.mkstemp(suffix='.csv', dir=self._infile_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as infile:
+                for row in rows:
+                    infile.write(','.join(map(_csv_field, row)) + '\n')
+            with self._connection() as conn:
+                # LOAD DATA LOCAL behaves like INSERT IGNORE, skipping duplicate keys and truncating bad values
+                # with only a warning, so it runs in its own (sub)transaction that is undone unless every row
+                # went in cleanly
+                nested = self._in_transaction()
+                if nested:
+                    self._execute_query(conn, "SAVEPOINT mw_load_data")
+                else:
+                    conn.start_transaction()
+                try:
+                    cursor = self._execute_query(conn, self._statements.load_data(table, cols), (path,))
+                    if cursor.rowcount != len(data_list) or cursor.warning_count:
+                        raise DataError(
+                            f"LOAD DATA loaded {cursor.rowcount} of {len(data_list)} rows "
+                            f"with {cursor.warning_count} warning(s)"
+                        )
+                except Error:
+                    if nested:
+                        self._execute_query(conn, "ROLLBACK TO SAVEPOINT mw_load_data")
+                    else:
+                        conn.rollback()
+                    raise
+                if nested:
+                    self._execute_query(conn, "RELEASE SAVEPOINT mw_load_data")
+                else:
+                    conn.commit()
+                self.invalidate(table)
+                logger.info("Loaded %d rows into %s", cursor.rowcount, table)
+                return cursor.lastrowid
+        finally:
+            os.unlink(path)
+
+    def insert_many_parallel(self, jobs):
+        """
+        Runs insert_many for several tables concurrently, each job on its own pooled connection,
+        so the network waits of independent bulk inserts overlap.
+
+        :param jobs: A list of (table, data_list) tuples.
+        :return: The results of insert_many, in the order of jobs.
+        """
+        if self._executor is None:
+            # The worker threads are shut down by close() together with the pool
+            self.connect()
+        futures = [self._executor.submit(self.insert_many, table, data_list) for table, data_list in jobs]
+        return [future.result() for future in futures]
+
     def update(self, table, data, where_clause):
         """
         Updates records in the specified table based on the provided where_clause.
@@ -152,14 +794,17 @@ class MySQLWrapper:
         :param where_clause: The WHERE clause to filter which records to update.
         """
         try:
-            set_clause = ', '.join([f"{key} = %s" for key in data.keys()])
-            query = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
-            cursor = self._execute_query(query, tuple(data.values()))
-            self.connection.commit()
-            logger.info(f"Updated {cursor.rowcount} row(s) in {table}")
-            return cursor.rowcount
+            query = self._statements.update(table, tuple(data), where_clause)
+            with self._connection() as conn:
+                # The literal WHERE clause makes nearly every UPDATE a new statement, which would cost a
+                # PREPARE each time and churn the prepared cursors, so it is sent as plain text
+                cursor = self._execute_query(conn, query, tuple(data.values()))
+                self._commit(conn)
+                self.invalidate(table)
+                logger.info("Updated %d row(s) in %s", cursor.rowcount, table)
+                return cursor.rowcount
         except Error as e:
-            logger.error(f"Error while updating data: {e}")
+            logger.error("Error while updating data: %s", e)
             raise e
 
     def delete(self, table, where_clause):
@@ -170,62 +815,165 @@ class MySQLWrapper:
         :param where_clause: The WHERE clause to filter which records to delete.
         """
         try:
-            query = f"DELETE FROM {table} WHERE {where_clause}"
-            cursor = self._execute_query(query)
-            self.connection.commit()
-            logger.info(f"Deleted {cursor.rowcount} row(s) from {table}")
-            return cursor.rowcount
+            query = self._statements.delete(table, where_clause)
+            with self._connection() as conn:
+                cursor = self._execute_query(conn, query)
+                self._commit(conn)
+                self.invalidate(table)
+                logger.info("Deleted %d row(s) from %s", cursor.rowcount, table)
+                return cursor.rowcount
         except Error as e:
-            logger.error(f"Error while deleting data: {e}")
+            logger.error("Error while deleting data: %s", e)
             raise e
 
-    def get(self, table, columns="*", where_clause=None):
+    def get(self, table, columns="*", where_clause=None, stream=False, arraysize=1000):
         """
         Retrieves data from the specified table based on the provided where_clause.
         
         :param table: The name of the table to retrieve data from.
-        :param columns: A list of columns to retrieve, or "*" for all columns.
+        :param columns: A list of columns to retrieve, or "*" for all columns. Plain names are quoted, while
+            expressions such as "COUNT(*)" or "name AS n" are passed through unchanged.
         :param where_clause: Optional WHERE clause to filter results.
-        :return: A list of tuples representing the retrieved rows.
+        :param stream: Whether to return a generator that streams rows instead of a list.
+            The query runs before get() returns; the rows bypass the query cache, and the generator holds
+            a pooled connection until it is exhausted or closed.
+        :param arraysize: Number of rows fetched per round-trip when streaming.
+        :return: A list of tuples representing the retrieved rows, or a generator of them when streaming,
+            or None on error. Inside transaction() errors are raised instead, so the block rolls back.
         """
         try:
             if isinstance(columns, list):
-                columns = ', '.join(columns)
-            query = f"SELECT {columns} FROM {table}"
-            if where_clause:
-                query += f" WHERE {where_clause}"
-            cursor = self._execute_query(query)
-            result = cursor.fetchall()
+                columns = tuple(columns)
+            query = self._statements.select(table, columns, where_clause)
+            if stream:
+                rows = self._stream(query, arraysize)
+                # Run the query now, so its errors are handled here rather than on the caller's first next()
+                next(rows)
+                return rows
+            key = _cache_key(table, columns, where_clause)
+            result = self._cache_get(key)
+            if result is not None:
+                return result
+            generation = self._cache_generation(table)
+            with self._connection() as conn:
+                cursor = self._execute_query(conn, query)
+                result = cursor.fetchall()
+            self._cache_put(key, table, result, generation)
             return result
         except Error as e:
-            logger.error(f"Error while retrieving data: {e}")
+            logger.error("Error while retrieving data: %s", e)
+            if self._in_transaction():
+                raise
             return None
 
+    def _stream(self, query, arraysize):
+        """
+        Yields the rows of a query, fetching arraysize rows at a time from an unbuffered cursor.
+        The first item is a None yielded once the query has run, which get() consumes.
+
+        :param query: SQL query to execute.
+        :param arraysize: Number of rows fetched per round-trip.
+        """
+        with self._connection() as conn:
+            cursor = self._execute_query(conn, query)
+            token = object()
+            with self._cursors_lock:
+                self._streams[conn._cnx] = token
+            try:
+                yield None
+                rows = cursor.fetchmany(arraysize)
+                while rows:
+                    yield from rows
+                    rows = cursor.fetchmany(arraysize)
+            finally:
+                self._end_stream(conn, token)
+
+    def _end_stream(self, conn, token=None):
+        """
+        Releases the connection from the stream reading it, dropping the rows a consumer that stopped early
+        left behind. A stream outliving its transaction() block may no longer own the connection; it then
+        leaves it alone.
+
+        :param conn: A connection acquired from the pool.
+        :param token: The stream's token, or None to end whichever stream owns the connection.
+        """
+        with self._cursors_lock:
+            owner = self._streams.get(conn._cnx)
+            if owner is None or (token is not None and owner is not token):
+                return
+            del self._streams[conn._cnx]
+        self._discard_unread(conn)
+
+    @staticmethod
+    def _discard_unread(conn):
+        """
+        Reads and drops any result left pending on the connection, so it does not break the next
+        query, commit, or user of the pooled connection.
+
+        :param conn: A connection acquired from the pool.
+        """
+        if conn.unread_result:
+            try:
+                conn.consume_results()
+            except Error:
+                pass
+
     def execute_query(self, query, params=None):
         """
         Executes a raw SQL query. This method can be used for any custom query, including SELECT, INSERT, UPDATE, and DELETE.
         
         :param query: The raw SQL query to execute.
         :param params: Optional parameters for the query (used with parameterized queries).
-        :return: The result of the query for SELECT statements, or None for other queries.
+        :return: The rows for statements that return them (SELECT, WITH, SHOW, EXPLAIN, ...),
+            the affected row count for other queries, or None on error. Inside transaction() errors are
+            raised instead, so the block rolls back.
         """
         try:
-            cursor = self._execute_query(query, params)
-            if query.strip().upper().startswith("SELECT"):
-                return cursor.fetchall()
-            else:
-                self.connection.commit()
+            is_read = _READ_QUERY_RE.match(query) is not None
+            if is_read:
+                key = _cache_key(query, params)
+                result = self._cache_get(key)
+                if result is not None:
+                    return result
+                generation = self._cache_generation(None)
+            with self._connection() as conn:
+                try:
+                    cursor = self._execute_query(conn, query, params)
+                    # Go by what the statement returned, since WITH can also lead an UPDATE or DELETE
+                    with_rows = cursor.with_rows
+                    if with_rows:
+                        result = cursor.fetchall()
+                finally:
+                    self._discard_unread(conn)
+                if with_rows:
+                    if is_read:
+                        self._cache_put(key, None, result, generation)
+                    return result
+                self._commit(conn)
+                self.invalidate()
+                logger.info("Query executed successfully: %d row(s) affected", cursor.rowcount)
                 return cursor.rowcount
-                logger.info(f"Query executed successfully: {cursor.rowcount} row(s) affected")
         except Error as e:
-            logger.error(f"Error while executing query: {e}")
+            logger.error("Error while executing query: %s", e)
+            if self._in_transaction():
+                raise
             return None
 
     def close(self):
         """
-        Closes the connection to the MySQL database.
+        Closes all pooled connections to the MySQL database.
         """
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            logger.info("MySQL connection closed")
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.invalidate()
+        with self._cursors_lock:
+            self._cursors.clear()
+        if self._pool is not None:
+            self._pool._remove_connections()
+            self._pool = None
+            logger.info("MySQL connection pool closed")
+        if self._infile_dir is not None:
+            shutil.rmtree(self._infile_dir, ignore_errors=True)
+            self._infile_dir = None
 
@@ -5,8 +5,12 @@ setup(
     version='0.4',
     packages=find_packages(),
     install_requires=[
-        'mysql-connector-python'
+        'mysql-connector-python',
+        'cachetools'
     ],
+    extras_require={
+        'async': ['aiomysql'],
+    },
     author='Ahmed Sharief',
     description='A generic MySQL wrapper for database operations.',
     long_description=open('README.md').read(),
@@ -0,0 +1,202 @@
+import csv
+import itertools
+import re
+
+import pytest
+from mysql.connector.errors import PoolError, ProgrammingError
+
+from mysql_wrapper import mysql_wrapper as mw
+
+
+class FakeServer:
+    """
+    Committed table contents shared by every fake connection.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.connection_ids = itertools.count(1)
+        self.row_ids = itertools.count(1)
+        # Rows LOAD DATA drops with only a warning, like the duplicate keys it skips on a real server
+        self.load_data_skips = 0
+
+
+class FakeCursor:
+    def __init__(self, cnx, prepared=False):
+        self.cnx = cnx
+        self.prepared = prepared
+        self.closed = False
+        self.rowcount = -1
+        self.lastrowid = None
+        self.warning_count = 0
+        self.with_rows = False
+        self.fetch_sizes = []
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.cnx.execute(self, query, params)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        self.cnx.unread_result = False
+        return rows
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        self.cnx.unread_result = bool(self._rows)
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    """
+    Understands the INSERT, LOAD DATA and SELECT * statements the wrapper builds, with REPEATABLE READ semantics:
+    the first statement of a transaction takes a snapshot that later reads keep seeing until it ends.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.connection_id = next(server.connection_ids)
+        self.in_transaction = False
+        self.unread_result = False
+        self.statements = []
+        self.fail_next = None
+        self.commits = 0
+        self._snapshot = None
+        self._pending = {}
+
+    def cursor(self, prepared=False):
+        return FakeCursor(self, prepared)
+
+    def _view(self):
+        if self._snapshot is None:
+            self._snapshot = {table: list(rows) for table, rows in self.server.tables.items()}
+        self.in_transaction = True
+        return self._snapshot
+
+    def execute(self, cursor, query, params):
+        self.statements.append(query)
+        if self.fail_next is not None:
+            error, self.fail_next = self.fail_next, None
+            raise error
+        cursor.with_rows = False
+        insert = re.match(r"INSERT INTO `(\w+)` \((.*?)\) VALUES", query)
+        select = re.match(r"SELECT \* FROM `(\w+)`", query)
+        load = re.match(r"LOAD DATA LOCAL INFILE %s INTO TABLE `(\w+)`", query)
+        if load:
+            with open(params[0], newline='') as infile:
+                rows = [tuple(row) for row in csv.reader(infile)]
+            rows = rows[self.server.load_data_skips:]
+            self._view().setdefault(load.group(1), []).extend(rows)
+            self._pending.setdefault(load.group(1), []).extend(rows)
+            cursor.rowcount = len(rows)
+            cursor.warning_count = self.server.load_data_skips
+            cursor.lastrowid = next(self.server.row_ids)
+        elif insert:
+            table = insert.group(1)
+            width = len(re.findall(r"`\w+`", insert.group(2)))
+            rows = [tuple(params[i:i + width]) for i in range(0, len(params), width)]
+            self._view().setdefault(table, []).extend(rows)
+            self._pending.setdefault(table, []).extend(rows)
+            cursor.rowcount = len(rows)
+            cursor.lastrowid = next(self.server.row_ids)
+        elif select:
+            cursor._rows = list(self._view().get(select.group(1), []))
+            cursor.with_rows = True
+            cursor.rowcount = -1
+            self.unread_result = bool(cursor._rows)
+        else:
+            cursor.rowcount = 0
+
+    def start_transaction(self):
+        if self.in_transaction:
+            raise ProgrammingError("Transaction already in progress")
+        self.in_transaction = True
+
+    def commit(self):
+        self.commits += 1
+        for table, rows in self._pending.items():
+            self.server.tables.setdefault(table, []).extend(rows)
+        self._end()
+
+    def rollback(self):
+        self._end()
+
+    def _end(self):
+        self._pending = {}
+        self._snapshot = None
+        self.in_transaction = False
+
+    def consume_results(self):
+        self.unread_result = False
+
+    def is_connected(self):
+        return True
+
+    def reconnect(self):
+        self.connection_id = next(self.server.connection_ids)
+        self._end()
+
+
+class FakePooledConnection:
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+
+    def __getattr__(self, attr):
+        return getattr(self._cnx, attr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._pool.queue.append(self._cnx)
+
+
+class FakePool:
+    """
+    Hands out connections first-in first-out, so consecutive operations use different connections.
+    """
+
+    def __init__(self, server, pool_size=5, **config):
+        self.config = config
+        self.connections = [FakeConnection(server) for _ in range(pool_size)]
+        self.queue = list(self.connections)
+
+    def get_connection(self):
+        if not self.queue:
+            raise PoolError("Failed getting connection; pool exhausted")
+        return FakePooledConnection(self, self.queue.pop(0))
+
+    def _remove_connections(self):
+        self.queue.clear()
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+@pytest.fixture
+def make_wrapper(monkeypatch, server):
+    """
+    Builds MySQLWrapper instances whose pool is a FakePool on the shared FakeServer.
+    """
+    monkeypatch.setattr(mw, "_IdleAwarePool", lambda **config: FakePool(server, **config))
+    wrappers = []
+
+    def make(**kwargs):
+        kwargs.setdefault("pool_size", 2)
+        wrapper = mw.MySQLWrapper("localhost", "user", "password", "test_db", **kwargs)
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make
+    for wrapper in wrappers:
+        wrapper.close()
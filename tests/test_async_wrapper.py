@@ -0,0 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+aiomysql = pytest.importorskip("aiomysql")
+
+from mysql_wrapper.async_wrapper import AsyncMySQLWrapper
+
+
+class FakeAsyncCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    async def execute(self, query, params=None):
+        self.conn.statements.append(query)
+        rows = self.conn.results.pop(0)
+        self.description = None if rows is None else [("col",)]
+        self.rowcount = 1 if rows is None else len(rows)
+        self._rows = rows
+
+    async def fetchall(self):
+        return tuple(self._rows)
+
+
+class FakeAsyncConnection:
+    def __init__(self, results):
+        self.results = results
+        self.statements = []
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield FakeAsyncCursor(self)
+
+
+class FakeAsyncPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def run(conn, coro_fn):
+    async def main():
+        db = AsyncMySQLWrapper("localhost", "user", "password", "test_db")
+        db._pool = FakeAsyncPool(conn)
+        return await coro_fn(db)
+    return asyncio.run(main())
+
+
+def test_execute_query_returns_the_rowcount_of_statements_without_a_result_set():
+    conn = FakeAsyncConnection([None])
+    query = "WITH stale AS (SELECT id FROM users) UPDATE users SET active = 0 WHERE id IN (SELECT id FROM stale)"
+
+    assert run(conn, lambda db: db.execute_query(query)) == 1
+
+
+def test_execute_query_returns_rows_of_a_result_set():
+    conn = FakeAsyncConnection([[(1,), (2,)]])
+
+    assert run(conn, lambda db: db.execute_query("SELECT id FROM users")) == ((1,), (2,))
+
+
+def test_pool_runs_in_autocommit_mode(monkeypatch):
+    created = {}
+
+    async def create_pool(**config):
+        created.update(config)
+        return FakeAsyncPool(FakeAsyncConnection([]))
+
+    monkeypatch.setattr(aiomysql, "create_pool", create_pool)
+    asyncio.run(AsyncMySQLWrapper("localhost", "user", "password", "test_db").connect())
+
+    assert created["autocommit"] is True
@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from mysql_wrapper import InsertBuffer
+
+
+class FakeWrapper:
+    """
+    Records the insert_many calls of an InsertBuffer, optionally failing them.
+    """
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def insert_many(self, table, data_list):
+        self.calls.append((table, data_list))
+        if self.error is not None:
+            raise self.error
+
+
+def test_flushes_once_max_batch_rows_are_pending():
+    wrapper = FakeWrapper()
+    with InsertBuffer(wrapper, max_batch=3, max_delay_ms=60000) as buffer:
+        futures = [buffer.put("events", {"id": i}) for i in range(3)]
+        for future in futures:
+            assert future.result(timeout=5) is None
+        assert wrapper.calls == [("events", [{"id": 0}, {"id": 1}, {"id": 2}])]
+
+
+def test_flushes_once_the_deadline_passes():
+    wrapper = FakeWrapper()
+    with InsertBuffer(wrapper, max_batch=500, max_delay_ms=20) as buffer:
+        future = buffer.put("events", {"id": 1})
+        # Well before close(), which would flush anyway
+        assert future.result(timeout=5) is None
+        assert wrapper.calls == [("events", [{"id": 1}])]
+
+
+def test_groups_rows_by_table_and_column_set():
+    wrapper = FakeWrapper()
+    with InsertBuffer(wrapper, max_batch=500, max_delay_ms=60000) as buffer:
+        buffer.put("events", {"id": 1})
+        buffer.put("users", {"id": 2})
+        buffer.put("events", {"id": 3, "kind": "click"})
+        buffer.put("events", {"id": 4})
+
+    assert sorted(wrapper.calls, key=repr) == sorted([
+        ("events", [{"id": 1}, {"id": 4}]),
+        ("users", [{"id": 2}]),
+        ("events", [{"id": 3, "kind": "click"}]),
+    ], key=repr)
+
+
+def test_close_flushes_pending_rows():
+    wrapper = FakeWrapper()
+    buffer = InsertBuffer(wrapper, max_batch=500, max_delay_ms=60000)
+    future = buffer.put("events", {"id": 1})
+    buffer.close()
+
+    assert future.done() and future.result() is None
+    assert wrapper.calls == [("events", [{"id": 1}])]
+
+
+def test_cancelled_rows_are_not_inserted():
+    wrapper = FakeWrapper()
+    with InsertBuffer(wrapper, max_batch=500, max_delay_ms=60000) as buffer:
+        cancelled = buffer.put("events", {"id": 1})
+        kept = buffer.put("events", {"id": 2})
+        assert cancelled.cancel()
+
+    assert kept.result() is None
+    assert wrapper.calls == [("events", [{"id": 2}])]
+
+
+def test_batch_errors_propagate_to_every_row():
+    error = ValueError("The data_list is empty.")
+    wrapper = FakeWrapper(error)
+    with InsertBuffer(wrapper, max_batch=2, max_delay_ms=60000) as buffer:
+        futures = [buffer.put("events", {"id": i}) for i in range(2)]
+
+    assert [future.exception() for future in futures] == [error, error]
+
+
+def test_put_after_close_raises():
+    buffer = InsertBuffer(FakeWrapper())
+    buffer.close()
+    buffer.close()
+
+    with pytest.raises(RuntimeError):
+        buffer.put("events", {"id": 1})
+
+
+def test_rows_put_while_closing_are_flushed_or_refused():
+    wrapper = FakeWrapper()
+    buffer = InsertBuffer(wrapper, max_batch=500, max_delay_ms=60000)
+    futures = []
+
+    def put_rows():
+        for i in range(1000):
+            try:
+                futures.append(buffer.put("events", {"id": i}))
+            except RuntimeError:
+                return
+
+    putter = threading.Thread(target=put_rows)
+    putter.start()
+    buffer.close()
+    putter.join()
+
+    # No row may be stranded behind the stop sentinel
+    assert all(future.done() for future in futures)
+
+
+@pytest.mark.parametrize("data, error", [(None, TypeError), (["id"], TypeError), ({}, ValueError)])
+def test_put_rejects_bad_records(data, error):
+    wrapper = FakeWrapper()
+    with InsertBuffer(wrapper, max_batch=1) as buffer:
+        with pytest.raises(error):
+            buffer.put("events", data)
+        # The flushing thread is unaffected
+        assert buffer.put("events", {"id": 1}).result(timeout=5) is None
+
+
+def test_unexpected_flush_errors_fail_the_batch_not_the_thread():
+    wrapper = FakeWrapper()
+    with InsertBuffer(wrapper, max_batch=1) as buffer:
+        flush = buffer._flush
+        error = KeyError("id")
+
+        def fail_once(items):
+            buffer._flush = flush
+            raise error
+
+        buffer._flush = fail_once
+        assert buffer.put("events", {"id": 1}).exception(timeout=5) is error
+        assert buffer.put("events", {"id": 2}).result(timeout=5) is None
+    assert wrapper.calls == [("events", [{"id": 2}])]
@@ -0,0 +1,503 @@
+import queue
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError, ProgrammingError
+
+from mysql_wrapper import mysql_wrapper as mw
+
+
+def test_get_sees_rows_committed_on_another_connection(make_wrapper):
+    db = make_wrapper()
+
+    assert db.get("users") == []
+    db.insert_one("users", {"name": "Ada"})
+
+    # The first get() ran on the connection this one gets back; its read must not have pinned a snapshot
+    assert db.get("users") == [("Ada",)]
+
+
+def test_transaction_after_get_starts_cleanly(make_wrapper):
+    db = make_wrapper()
+    db.get("users")
+    db.insert_one("users", {"name": "Ada"})
+
+    with db.transaction():
+        db.insert_one("users", {"name": "Grace"})
+
+    assert db.get("users") == [("Ada",), ("Grace",)]
+
+
+def test_connections_return_to_the_pool_outside_a_transaction(make_wrapper):
+    db = make_wrapper()
+    db.get("users")
+    db.insert_one("users", {"name": "Ada"})
+
+    assert not any(cnx.in_transaction for cnx in db._pool.connections)
+
+
+def test_failed_prepared_statement_only_evicts_its_cursor(make_wrapper, monkeypatch):
+    monkeypatch.setattr(mw, "_PREPARE_INSERTS", True)
+    db = make_wrapper(pool_size=1)
+    db.insert_one("users", {"name": "Ada"})
+    db.insert_one("teams", {"title": "Ops"})
+    cnx = db._pool.connections[0]
+    cursors = db._cursors[cnx]
+    users = db._statements.insert("users", ("name",))
+    teams = db._statements.insert("teams", ("title",))
+    failing, kept = cursors.prepared[users], cursors.prepared[teams]
+
+    cnx.fail_next = ProgrammingError("Unknown column 'name'")
+    with pytest.raises(ProgrammingError):
+        db.insert_one("users", {"name": "Grace"})
+
+    assert failing.closed and users not in cursors.prepared
+    assert db._cursors[cnx] is cursors
+    assert cursors.prepared[teams] is kept and not kept.closed
+    assert not cursors.plain.closed
+
+
+def test_failed_plain_statement_keeps_the_cursor_cache(make_wrapper):
+    db = make_wrapper(pool_size=1)
+    db.insert_one("users", {"name": "Ada"})
+    cnx = db._pool.connections[0]
+    cursors = db._cursors[cnx]
+
+    cnx.fail_next = ProgrammingError("Table 'test_db.missing' doesn't exist")
+    assert db.get("missing") is None
+
+    assert db._cursors[cnx] is cursors
+
+
+def test_bulk_load_commits_every_row(make_wrapper, server):
+    db = make_wrapper(bulk_threshold=3)
+    db.insert_many("users", [{"name": name} for name in ("Ada", "Grace", "Linus")])
+
+    assert server.tables["users"] == [('Ada',), ('Grace',), ('Linus',)]
+    assert any(query.startswith("LOAD DATA") for cnx in db._pool.connections for query in cnx.statements)
+
+
+def test_bulk_load_that_skips_rows_falls_back_to_inserts(make_wrapper, server):
+    db = make_wrapper(bulk_threshold=3)
+    server.load_data_skips = 1
+    db.insert_many("users", [{"name": name} for name in ("Ada", "Grace", "Linus")])
+
+    # The partial load was rolled back, so the INSERT fallback leaves each row exactly once
+    assert server.tables["users"] == [('Ada',), ('Grace',), ('Linus',)]
+
+
+def test_bulk_loading_is_opt_in(make_wrapper):
+    db = make_wrapper()
+    db.insert_many("users", [{"name": "Ada"}] * 100000)
+
+    assert db._infile_dir is None
+    assert not any(query.startswith("LOAD DATA") for cnx in db._pool.connections for query in cnx.statements)
+
+
+def test_failed_connect_removes_the_infile_directory(monkeypatch, tmp_path):
+    def refuse(**config):
+        raise InterfaceError("Can't connect to MySQL server")
+
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(mw, "_IdleAwarePool", refuse)
+    with pytest.raises(InterfaceError):
+        mw.MySQLWrapper("localhost", "user", "password", "test_db", bulk_threshold=3)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_borrowing_from_an_exhausted_pool_times_out(make_wrapper):
+    db = make_wrapper(pool_size=1, pool_timeout=0.05)
+    db.insert_one("users", {"name": "Ada"})
+
+    rows = db.get("users", stream=True)
+    assert next(rows) == ('Ada',)
+    # The stream still holds the only connection, so a nested borrow can never be served
+    with pytest.raises(PoolError):
+        db.insert_one("users", {"name": "Grace"})
+    rows.close()
+
+    db.insert_one("users", {"name": "Grace"})
+
+
+def test_reads_inside_a_transaction_bypass_the_query_cache(make_wrapper, server):
+    db = make_wrapper(query_cache_ttl=60)
+    assert db.get("users") == []
+    server.tables["users"] = [('Ada',)]
+
+    with db.transaction():
+        assert db.get("users") == [('Ada',)]
+        db.insert_one("users", {"name": "Grace"})
+        assert db.execute_query("SELECT * FROM `users` FOR UPDATE") == [('Ada',), ('Grace',)]
+        # Nothing read inside the block was cached
+        assert not db._qcache
+
+
+def test_open_breaker_fails_reads_like_other_errors(make_wrapper):
+    db = make_wrapper(pool_size=1)
+    cnx = db._pool.connections[0]
+    db._trip_breaker()
+
+    cnx.fail_next = OperationalError("Lost connection to MySQL server during query")
+    assert db.get("users") is None
+    cnx.fail_next = OperationalError("Lost connection to MySQL server during query")
+    assert db.execute_query("SELECT 1") is None
+
+
+def test_open_breaker_refuses_to_connect_without_extending_the_backoff(make_wrapper):
+    db = make_wrapper()
+    db.close()
+    db._trip_breaker()
+    open_until = db._breaker['open_until']
+
+    with pytest.raises(mw.CircuitOpenError):
+        db.connect()
+    assert db._breaker == {'fail_count': 1, 'open_until': open_until}
+
+
+def test_pool_reconnects_idle_connections_through_the_callback():
+    class IdleConnection:
+        pool_config_version = 1
+        last_active_time = 0.0
+
+        def is_connected(self):
+            return False
+
+        def config(self, **config):
+            pass
+
+    def refuse(cnx):
+        raise mw.CircuitOpenError("MySQL circuit breaker is open")
+
+    pool = mw._IdleAwarePool.__new__(mw._IdleAwarePool)
+    pool.idle_timeout = 0
+    pool._reconnect = refuse
+    pool._config_version = 1
+    pool._cnx_config = {}
+    pool._cnx_queue = queue.Queue()
+    cnx = IdleConnection()
+    pool._cnx_queue.put(cnx)
+    requeued = []
+    pool._queue_connection = requeued.append
+
+    with pytest.raises(mw.CircuitOpenError):
+        pool.get_connection()
+    # The connection went back to the pool for the next attempt
+    assert requeued == [cnx]
+
+
+def test_idle_timeout_keeps_its_positional_slot(make_wrapper):
+    # make_wrapper has already swapped in the fake pool
+    db = mw.MySQLWrapper("localhost", "user", "password", "test_db", 600)
+    try:
+        assert db.idle_timeout == 600 and db.pool_size == 5
+        with pytest.raises(TypeError):
+            mw.MySQLWrapper("localhost", "user", "password", "test_db", 600, 5)
+    finally:
+        db.close()
+
+
+def test_failed_statement_rolls_back_the_whole_transaction(make_wrapper, server):
+    db = make_wrapper(pool_size=1)
+    cnx = db._pool.connections[0]
+
+    with pytest.raises(ProgrammingError):
+        with db.transaction():
+            db.insert_one("users", {"name": "Ada"})
+            cnx.fail_next = ProgrammingError("Unknown column 'nmae' in 'field list'")
+            db.execute_query("UPDATE users SET nmae = 'Grace'")
+
+    assert "users" not in server.tables
+    assert db.get("users") == []
+
+
+def test_queries_interleaved_with_a_stream_in_a_transaction_are_refused(make_wrapper, server):
+    db = make_wrapper(pool_size=1)
+    server.tables["users"] = [('Ada',), ('Grace',), ('Linus',)]
+
+    with pytest.raises(ProgrammingError):
+        with db.transaction():
+            rows = db.get("users", stream=True, arraysize=1)
+            assert next(rows) == ('Ada',)
+            db.insert_one("teams", {"title": "Ops"})
+
+    # Once the stream is finished the connection is usable again
+    with db.transaction():
+        assert list(db.get("users", stream=True)) == [('Ada',), ('Grace',), ('Linus',)]
+        db.insert_one("teams", {"title": "Ops"})
+    assert server.tables["teams"] == [('Ops',)]
+
+
+@pytest.mark.parametrize("cext", [False, True])
+def test_only_inserts_with_the_c_extension_are_prepared(make_wrapper, monkeypatch, cext):
+    monkeypatch.setattr(mw, "_PREPARE_INSERTS", cext)
+    db = make_wrapper(pool_size=1)
+    db.insert_one("users", {"name": "Ada"})
+    for i in range(3):
+        db.update("users", {"name": "Grace"}, f"id = {i}")
+
+    cursors = db._cursors[db._pool.connections[0]]
+    assert list(cursors.prepared) == ([db._statements.insert("users", ("name",))] if cext else [])
+
+
+def test_queries_after_close_reconnect_lazily(make_wrapper, server):
+    db = make_wrapper()
+    db.close()
+
+    db.insert_one("users", {"name": "Ada"})
+    assert db.get("users") == [('Ada',)]
+    db.close()
+    assert db.execute_query("SELECT * FROM `users`") == [('Ada',)]
+
+
+def test_insert_many_parallel_inserts_every_job(make_wrapper, server):
+    db = make_wrapper()
+    db.close()
+
+    db.insert_many_parallel([("users", [{"name": "Ada"}, {"name": "Grace"}]), ("teams", [{"title": "Ops"}])])
+
+    assert server.tables == {"users": [('Ada',), ('Grace',)], "teams": [('Ops',)]}
+
+
+def test_insert_many_parallel_returns_results_in_job_order(make_wrapper, monkeypatch):
+    db = make_wrapper(pool_size=3)
+
+    def insert_many(table, data_list):
+        # Later jobs finish first
+        time.sleep(data_list[0])
+        return table
+
+    monkeypatch.setattr(db, "insert_many", insert_many)
+    jobs = [("users", [0.06]), ("teams", [0.03]), ("tags", [0.0])]
+
+    assert db.insert_many_parallel(jobs) == ["users", "teams", "tags"]
+
+
+def test_stream_fetches_arraysize_rows_at_a_time(make_wrapper, server):
+    db = make_wrapper(pool_size=1)
+    server.tables["users"] = [(i,) for i in range(5)]
+
+    assert list(db.get("users", stream=True, arraysize=2)) == [(i,) for i in range(5)]
+    assert db._cursors[db._pool.connections[0]].plain.fetch_sizes == [2, 2, 2, 2]
+
+
+def test_failed_stream_returns_none_like_other_reads(make_wrapper):
+    db = make_wrapper(pool_size=1)
+    db._pool.connections[0].fail_next = ProgrammingError("Table 'test_db.missing' doesn't exist")
+
+    assert db.get("missing", stream=True) is None
+    # The failed stream gave its connection back
+    assert list(db.get("missing", stream=True)) == []
+
+
+@pytest.mark.parametrize("autocommit, retried", [(False, True), (True, False)])
+def test_writes_are_retried_after_a_dropped_connection_only_without_autocommit(make_wrapper, server,
+                                                                             autocommit, retried):
+    db = make_wrapper(pool_size=1, autocommit=autocommit)
+    cnx = db._pool.connections[0]
+    cnx.fail_next = OperationalError("Lost connection to MySQL server during query", errno=2013)
+
+    if retried:
+        db.insert_many("users", [{"name": "Ada"}])
+        assert server.tables["users"] == [('Ada',)]
+    else:
+        with pytest.raises(OperationalError):
+            db.insert_many("users", [{"name": "Ada"}])
+    # Either way the connection was reconnected for the next caller
+    assert cnx.connection_id != 1
+
+
+def test_reads_are_retried_after_a_dropped_connection_in_autocommit_mode(make_wrapper):
+    db = make_wrapper(pool_size=1, autocommit=True)
+    db._pool.connections[0].fail_next = OperationalError("Lost connection to MySQL server during query")
+
+    assert db.get("users") == []
+
+
+def test_pool_only_pings_connections_idle_for_idle_timeout(monkeypatch):
+    class Connection:
+        pool_config_version = 1
+
+        def __init__(self, last_active_time):
+            self.last_active_time = last_active_time
+            self.pings = 0
+
+        def is_connected(self):
+            self.pings += 1
+            return True
+
+    monkeypatch.setattr(mw, "PooledMySQLConnection", lambda pool, cnx: cnx)
+    pool = mw._IdleAwarePool.__new__(mw._IdleAwarePool)
+    pool.idle_timeout = 300
+    pool._config_version = 1
+    pool._cnx_queue = queue.Queue()
+    recent, idle = Connection(time.monotonic()), Connection(time.monotonic() - 600)
+    pool._cnx_queue.put(recent)
+    pool._cnx_queue.put(idle)
+
+    assert pool.get_connection() is recent and recent.pings == 0
+    assert pool.get_connection() is idle and idle.pings == 1
+
+
+def test_rows_read_before_a_concurrent_invalidation_are_not_cached(make_wrapper, server):
+    db = make_wrapper(query_cache_ttl=60)
+    execute_query = db._execute_query
+
+    def write_during_read(conn, query, params=None, prepared=False):
+        cursor = execute_query(conn, query, params, prepared)
+        table = query.split("`")[1]
+        # Another thread commits a write and invalidates after this read ran, but before it is cached
+        server.tables[table] = [('Ada',)]
+        db.invalidate(table)
+        return cursor
+
+    db._execute_query = write_during_read
+    assert db.get("users") == []
+    assert db.execute_query("SELECT * FROM `teams`") == []
+    del db._execute_query
+
+    assert not db._qcache
+    assert db.get("users") == [('Ada',)]
+    assert db.execute_query("SELECT * FROM `teams`") == [('Ada',)]
+
+
+def test_statement_cache_reuses_and_evicts_statements():
+    statements = mw._StatementCache(maxsize=2)
+    first = statements.insert("users", ("name",))
+
+    # The same string object is returned, which lets prepared cursors skip re-preparing it
+    assert statements.insert("users", ("name",)) is first
+    statements.insert("teams", ("name",))
+    statements.insert("tags", ("name",))
+    assert statements.insert("users", ("name",)) is not first
+
+    statements.clear()
+    assert not statements._skel
+
+
+def test_statement_cache_builds_quoted_statements():
+    statements = mw._StatementCache()
+
+    assert statements.insert("db.users", ("name", "a`b")) == "INSERT INTO `db`.`users` (`name`, `a``b`) VALUES (%s, %s)"
+    assert statements.insert_many("users", ("id", "name"), 2) == (
+        "INSERT INTO `users` (`id`, `name`) VALUES (%s, %s), (%s, %s)"
+    )
+    assert statements.update("users", ("name",), "id = 1") == "UPDATE `users` SET `name` = %s WHERE id = 1"
+    assert statements.delete("users", "id = 1") == "DELETE FROM `users` WHERE id = 1"
+    assert statements.select("users", "*", None) == "SELECT * FROM `users`"
+    assert statements.select("users", ("id", "name"), "id > 1") == "SELECT `id`, `name` FROM `users` WHERE id > 1"
+
+
+@pytest.mark.parametrize("value, field", [
+    (None, 'NULL'),
+    (True, '1'),
+    (False, '0'),
+    (42, '42'),
+    (1.5, '1.5'),
+    (Decimal('9.99'), '9.99'),
+    ('plain', '"plain"'),
+    ('say "hi", then\nleave', '"say ""hi"", then\nleave"'),
+    ('NULL', '"NULL"'),
+    (date(2024, 2, 29), '"2024-02-29"'),
+])
+def test_csv_field(value, field):
+    assert mw._csv_field(value) == field
+
+
+def test_csv_field_rejects_binary_values():
+    with pytest.raises(ValueError):
+        mw._csv_field(b'\x00')
+
+
+@pytest.mark.parametrize("query, is_read", [
+    ("SELECT 1", True),
+    ("  select * from users", True),
+    ("\n\tWITH t AS (SELECT 1) SELECT * FROM t", True),
+    ("SHOW TABLES", True),
+    ("EXPLAIN SELECT 1", True),
+    ("DESCRIBE users", True),
+    ("DESC users", True),
+    ("INSERT INTO users VALUES (1)", False),
+    ("UPDATE users SET name = 'SELECT'", False),
+    ("SELECTED", False),
+    ("DESCENDING", False),
+])
+def test_read_query_re(query, is_read):
+    assert bool(mw._READ_QUERY_RE.match(query)) is is_read
+
+
+def test_breaker_backs_off_exponentially_up_to_30s(make_wrapper, monkeypatch):
+    db = make_wrapper()
+    now = [1000.0]
+    monkeypatch.setattr(mw.time, "monotonic", lambda: now[0])
+
+    db._trip_breaker()
+    assert db._breaker['open_until'] == pytest.approx(1000.2)
+    db._trip_breaker()
+    assert db._breaker['open_until'] == pytest.approx(1000.4)
+    for _ in range(20):
+        db._trip_breaker()
+    assert db._breaker['open_until'] == pytest.approx(1030.0)
+
+    with pytest.raises(mw.CircuitOpenError):
+        db._check_breaker()
+    now[0] = 1030.0
+    db._check_breaker()
+
+    db._reset_breaker()
+    assert db._breaker == {'fail_count': 0, 'open_until': 0.0}
+
+
+def test_insert_many_splits_records_into_chunks(make_wrapper, server):
+    db = make_wrapper(pool_size=1)
+    db.insert_many("users", [{"name": f"user{i}"} for i in range(5)], chunk_size=2)
+
+    inserts = [query for query in db._pool.connections[0].statements if query.startswith("INSERT")]
+    assert [query.count("(%s)") for query in inserts] == [2, 2, 1]
+    assert server.tables["users"] == [(f"user{i}",) for i in range(5)]
+
+
+def test_insert_many_accepts_sequence_records_with_columns(make_wrapper, server):
+    db = make_wrapper()
+    db.insert_many("users", [("Ada", 36), ["Grace", 85]], columns=["name", "age"])
+
+    assert server.tables["users"] == [("Ada", 36), ("Grace", 85)]
+
+
+def test_insert_many_requires_columns_for_sequence_records(make_wrapper):
+    db = make_wrapper()
+
+    with pytest.raises(ValueError):
+        db.insert_many("users", [("Ada", 36)])
+
+
+@pytest.mark.parametrize("cols, values", [(("name",), ("Ada",)), (("name", "age"), ("Ada", 36))])
+def test_row_getter_returns_a_tuple_in_column_order(cols, values):
+    assert mw._row_getter(cols)({"age": 36, "name": "Ada"}) == values
+
+
+def test_compress_and_autocommit_are_passed_to_the_pool(make_wrapper):
+    db = make_wrapper(compress=True, autocommit=True)
+
+    assert db._pool.config["compress"] is True and db._pool.config["autocommit"] is True
+
+
+@pytest.mark.parametrize("autocommit, commits", [(False, 3), (True, 0)])
+def test_autocommit_skips_the_commits(make_wrapper, autocommit, commits):
+    db = make_wrapper(pool_size=1, autocommit=autocommit)
+    db.insert_one("users", {"name": "Ada"})
+    db.insert_many("users", [{"name": "Grace"}])
+    db.update("users", {"name": "Linus"}, "id = 1")
+
+    assert db._pool.connections[0].commits == commits
+
+
+def test_select_passes_column_expressions_through():
+    statements = mw._StatementCache()
+
+    assert statements.select("users", ("users.id", "COUNT(*)", "name AS n"), None) == (
+        "SELECT `users`.`id`, COUNT(*), name AS n FROM `users`"
+    )